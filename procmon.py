@@ -6,31 +6,38 @@ Carrega configuração, lida com CLI ou inicia o loop de monitoramento.
 """
 
 from dotenv import load_dotenv
+import logging
 import os
 import sys
 import time
 import datetime
-import logging  # Ainda necessário para o logging no loop principal
+import queue
+import threading
 
 # Importa dos nossos módulos customizados
-from procmon_models import PidFilter
-from procmon_utils import (
-    setup_logger,
-    get_timestamp_str,
-    get_log_filename,
-    get_system_stats,
-    get_process_stats,
-    get_top_processes,
-    CoreInfoError,
-    get_core_info,
-    StatsCollectionError  # Importa a exceção customizada
-)
+# (procmon_utils, que carrega o psutil, só é importado quando o monitoramento inicia,
+#  para que as opções da CLI como -v respondam rapidamente)
 import procmon_cli  # Importa o módulo CLI inteiro
 
 # --- Constantes ---
 __DESCRIPTION__ = "ProcMon - Monitor de Sistema e Processos"
 __VERSION__ = "1.1.2"  # Incrementa a versão após refatoração
 
+# Formatos fixos das mensagens emitidas a cada tick (argumentos formatados pelo próprio logging).
+# Os PIDs fazem parte da própria mensagem: toda mensagem de log começa com _PIDS_FMT
+# (ou _NO_PIDS quando não se aplicam), o campo esperado por procmon_cli.parse_log_line
+_PIDS_FMT = "PIDs[%s] :: "
+_NO_PIDS = _PIDS_FMT % 'N/A'
+_STATS_FMT = _PIDS_FMT + "Uso CPU: %.1f%% | Uso Memória: %.1f%%"
+_TOP_FMT = "  - PID: %-6d | CPU: %5.1f%% | Mem: %5.1f%% | Nome: %s"
+
+# --- Opções que não dependem da configuração ---
+# -v/--version e -h/--help são respondidas antes de ler o .env e de criar o diretório de logs
+# (handle_cli_args imprime a versão/ajuda sem usar o config)
+if __name__ == "__main__" and any(arg in ('-v', '--version', '-h', '--help') for arg in sys.argv[1:]):
+    procmon_cli.handle_cli_args(__DESCRIPTION__, __VERSION__, {})
+    sys.exit(0)
+
 # --- Configuração Inicial ---
 if getattr(sys, 'frozen', False):
     BASE_DIR = os.path.dirname(sys.executable)
@@ -45,9 +52,16 @@ config = {
     'LOG_PATH': os.getenv('PATH_LOG_FILES', os.path.join(BASE_DIR, 'logs')),
     'FILENAME_TEMPLATE': os.getenv('PRINCIPAL_FILENAME_LOG', 'PROCESSMONITOR_%DATAHORA%.log'),
     'MONITORING_PROCESS_NAMES': [p.strip() for p in os.getenv('MONITORING_PROCESSES', '').split(',') if p.strip()],
-    'MONITOR_INTERVAL_SECONDS': int(os.getenv('MONITOR_INTERVAL_SECONDS', 5))
+    'MONITOR_INTERVAL_SECONDS': int(os.getenv('MONITOR_INTERVAL_SECONDS', 5)),
+    'USE_PROCFS_SCAN': os.getenv('USE_PROCFS_SCAN', '').lower() in ('1', 'true', 'yes'),
+    'PROC_SCAN_WORKERS': max(1, int(os.getenv('PROC_SCAN_WORKERS', 1))),
+    'LOG_MAX_BYTES': int(os.getenv('LOG_MAX_BYTES', 0)),
+    'LOG_BACKUP_COUNT': int(os.getenv('LOG_BACKUP_COUNT', 5))
 }
 
+# Intervalo máximo (segundos) entre duas conferências da hora para a rotação dos logs
+_ROTATION_CHECK_MAX_SECONDS = 60
+
 # Cria o diretório de log se não existir
 try:
     os.makedirs(config['LOG_PATH'], exist_ok=True)
@@ -61,184 +75,351 @@ except OSError as e:
 # Dicionários globais para gerenciar loggers e nomes de arquivos atuais
 loggers = {}
 current_log_filenames = {}
-# Instancia o filtro PID
-pid_filter = PidFilter()
+# Protege a troca de handlers (thread de rotação) contra o log do tick (loop principal)
+loggers_lock = threading.Lock()
+# Snapshots descartados pela thread coletora porque o loop de log não os consumiu a tempo
+dropped_snapshots = 0
+
+# Último registro (time.monotonic) de cada erro recorrente: {(alvo, tipo da exceção): instante}
+_last_error_log = {}
+# Um mesmo erro do mesmo alvo é registrado no máximo uma vez a cada N segundos
+_ERROR_LOG_COOLDOWN_SECONDS = 60
+
+
+def log_error_throttled(logger, target, error, msg, *args):
+    """
+    Registra msg (formatada com args pelo logging) no nível ERROR, a menos que o mesmo
+    tipo de erro já tenha sido registrado para 'target' nos últimos _ERROR_LOG_COOLDOWN_SECONDS
+    (evita repetir a cada tick um erro persistente, como acesso negado).
+    """
+    key = (target, type(error))
+    now = time.monotonic()
+    last = _last_error_log.get(key)
+    if last is not None and now - last < _ERROR_LOG_COOLDOWN_SECONDS:
+        return
+    _last_error_log[key] = now
+    logger.error(msg, *args)
+
+
+# --- Thread Coletora ---
+
+
+def stats_collector(snapshot_queue, stop_event):
+    """
+    Coleta as estatísticas a cada MONITOR_INTERVAL_SECONDS (prazo fixo via time.monotonic)
+    e publica o StatsSnapshot mais recente na fila, sem bloquear o loop de log.
+    Um erro inesperado encerra a coleta e é publicado na fila no lugar do snapshot,
+    para que o loop principal o registre e finalize o monitoramento.
+    """
+    global dropped_snapshots
+    from procmon_utils import collect_stats
+
+    next_deadline = time.monotonic()
+    while not stop_event.is_set():
+        try:
+            snapshot = collect_stats(
+                config['USE_PROCFS_SCAN'], config['PROC_SCAN_WORKERS'])
+        except Exception as e:
+            snapshot = e
+
+        # Mantém apenas o snapshot mais recente: se o anterior não foi consumido, é descartado
+        try:
+            snapshot_queue.get_nowait()
+            dropped_snapshots += 1
+        except queue.Empty:
+            pass
+        snapshot_queue.put_nowait(snapshot)
+        if isinstance(snapshot, Exception):
+            return
+
+        # --- Espera até o próximo tick (prazo fixo, sem acumular o tempo de coleta) ---
+        next_deadline += config['MONITOR_INTERVAL_SECONDS']
+        sleep_for = next_deadline - time.monotonic()
+        if sleep_for <= 0:
+            # Tick atrasado: recomeça a contagem a partir de agora em vez de "correr atrás"
+            next_deadline = time.monotonic()
+            sleep_for = 0
+        stop_event.wait(sleep_for)
+
+
+# --- Rotação dos Loggers ---
+
+
+def rotate_loggers(current_timestamp_str, is_rotation):
+    """
+    Cria/recria os loggers (global, processos e topten) para a hora de current_timestamp_str.
+    Nas rotações roda na thread de rotação: os novos arquivos são abertos e os antigos
+    fechados fora de loggers_lock, que só é segurado durante a troca dos handlers.
+    """
+    from procmon_utils import setup_logger, get_log_filename, get_console_timestamp
+
+    try:
+        current_hour_str = current_timestamp_str[:-2]
+        print(f"[{get_console_timestamp()}] INFO: Verificando/Atualizando loggers para a hora {current_hour_str}...")
+
+        # Configura/Recria logger global (sem alteração)
+        global_log_file = get_log_filename(
+            config['LOG_PATH'], config['FILENAME_TEMPLATE'], current_timestamp_str)
+        global_logger = setup_logger(
+            'global', global_log_file, loggers, current_log_filenames, loggers_lock,
+            config['LOG_MAX_BYTES'], config['LOG_BACKUP_COUNT'])
+        if is_rotation:  # Evita logar na primeira vez que roda setup_logger
+            global_logger.info(
+                f"{_NO_PIDS}Rotacionando log. Continuando para a hora {current_hour_str} neste arquivo.")
+        else:
+            global_logger.info(
+                f"{_NO_PIDS}Iniciando log para a hora {current_hour_str} neste arquivo.")
+
+        # Configura/Recria loggers dos processos (sem alteração)
+        for proc_name in config['MONITORING_PROCESS_NAMES']:
+            proc_log_file = get_log_filename(
+                config['LOG_PATH'], config['FILENAME_TEMPLATE'], current_timestamp_str, process_name=proc_name)
+            proc_logger = setup_logger(
+                proc_name, proc_log_file, loggers, current_log_filenames, loggers_lock,
+                config['LOG_MAX_BYTES'], config['LOG_BACKUP_COUNT'])
+            proc_logger.info(
+                f"{_NO_PIDS}Iniciando/Continuando log do processo '{proc_name}' para a hora {current_hour_str} neste arquivo.")
+
+        # ---> Configura/Recria logger TopTen <---
+        topten_logger_name = "topten"  # Nome para identificar o logger
+        # Usa get_log_filename passando "topten" como 'process_name' para adicionar o prefixo
+        topten_log_file = get_log_filename(
+            config['LOG_PATH'], config['FILENAME_TEMPLATE'], current_timestamp_str, process_name=topten_logger_name)
+        topten_logger = setup_logger(
+            topten_logger_name, topten_log_file, loggers, current_log_filenames, loggers_lock,
+            config['LOG_MAX_BYTES'], config['LOG_BACKUP_COUNT'])
+        topten_logger.info(
+            f"{_NO_PIDS}Iniciando/Continuando log Top 10 CPU para a hora {current_hour_str} neste arquivo.")
+    except Exception as e:
+        print(f"ERRO ao configurar os loggers para a hora {current_timestamp_str[:-2]}: {e}", file=sys.stderr)
+        if not is_rotation:
+            raise  # Sem loggers iniciais não há como monitorar
+
 
 # --- Loop Principal de Monitoramento --- (Movido para uma função)
 
 
 def main_monitor_loop():
-    """Loop principal que coleta e registra as estatísticas periodicamente."""
+    """Loop principal que registra as estatísticas publicadas pela thread coletora."""
     global loggers, current_log_filenames
 
+    import concurrent.futures  # Só necessário no monitoramento (mantém -v/-l rápidos)
+
+    from procmon_utils import (
+        flush_loggers,
+        get_timestamp_str,
+        get_console_timestamp,
+        get_hour_key,
+        build_name_matcher,
+        get_all_process_stats,
+        get_top_processes,
+        CoreInfoError,
+        StatsCollectionError  # Importa a exceção customizada
+    )
+
     # ... (mensagens iniciais de print) ...
 
-    last_checked_hour_str = ""
+    # Matcher dos nomes monitorados, montado uma única vez (nenhum se a lista estiver vazia)
+    monitored_names = config['MONITORING_PROCESS_NAMES']
+    name_matcher = build_name_matcher(monitored_names) if monitored_names else None
+
+    last_hour_key = None
+    next_rotation_check = 0.0  # Prazo (time.monotonic) da próxima conferência da hora
+    all_process_stats = None  # Totais por processo, reaproveitados entre os ticks
     global_logger = None
     topten_logger = None  # Variável para guardar o logger topten
 
+    snapshot_queue = queue.Queue(maxsize=1)
+    stop_event = threading.Event()
+    collector = threading.Thread(
+        target=stats_collector, args=(snapshot_queue, stop_event),
+        name='procmon-collector', daemon=True)
+    collector.start()
+    rotation_executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=1, thread_name_prefix='procmon-rotation')
+
     try:
         while True:
-            current_timestamp_str = get_timestamp_str()
-            current_hour_str = current_timestamp_str[:-2]
+            # Espera pelo próximo snapshot; o timeout curto mantém o Ctrl+C responsivo
+            try:
+                stats = snapshot_queue.get(timeout=1.0)
+            except queue.Empty:
+                if not collector.is_alive():
+                    raise RuntimeError("A thread coletora terminou inesperadamente.")
+                continue
+            if isinstance(stats, Exception):
+                raise stats  # Erro inesperado na thread coletora (registrado como CRÍTICO abaixo)
 
             # --- Rotação/Criação de Loggers por Hora ---
-            if current_hour_str != last_checked_hour_str:
-                print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] INFO: Verificando/Atualizando loggers para a hora {current_hour_str}...")
-
-                # Configura/Recria logger global (sem alteração)
-                global_log_file = get_log_filename(
-                    config['LOG_PATH'], config['FILENAME_TEMPLATE'], current_timestamp_str)
-                global_logger = setup_logger(
-                    'global', global_log_file, loggers, current_log_filenames, pid_filter)
-                if last_checked_hour_str != "":  # Evita logar na primeira vez que roda setup_logger
-                    global_logger.info(
-                        f"Rotacionando log. Continuando para a hora {current_hour_str} neste arquivo.")
-                else:
-                    global_logger.info(
-                        f"Iniciando log para a hora {current_hour_str} neste arquivo.")
-
-                # Configura/Recria loggers dos processos (sem alteração)
-                for proc_name in config['MONITORING_PROCESS_NAMES']:
-                    proc_log_file = get_log_filename(
-                        config['LOG_PATH'], config['FILENAME_TEMPLATE'], current_timestamp_str, process_name=proc_name)
-                    proc_logger = setup_logger(
-                        proc_name, proc_log_file, loggers, current_log_filenames, pid_filter)
-                    proc_logger.info(
-                        f"Iniciando/Continuando log do processo '{proc_name}' para a hora {current_hour_str} neste arquivo.")
-
-                # ---> Configura/Recria logger TopTen <---
-                topten_logger_name = "topten"  # Nome para identificar o logger
-                # Usa get_log_filename passando "topten" como 'process_name' para adicionar o prefixo
-                topten_log_file = get_log_filename(
-                    config['LOG_PATH'], config['FILENAME_TEMPLATE'], current_timestamp_str, process_name=topten_logger_name)
-                topten_logger = setup_logger(
-                    topten_logger_name, topten_log_file, loggers, current_log_filenames, pid_filter)
-                topten_logger.info(
-                    f"Iniciando/Continuando log Top 10 CPU para a hora {current_hour_str} neste arquivo.")
-                # --------------------------------------
-
-                last_checked_hour_str = current_hour_str
-
-            # --- Coleta e Log Global --- (sem alteração)
-            if global_logger:
-                try:
-                    cpu, mem = get_system_stats()
-                    log_message = f"Uso CPU: {cpu:.1f}% | Uso Memória: {mem:.1f}%"
-                    global_logger.info(log_message)
-                except StatsCollectionError as e:
-                    global_logger.error(f"Falha ao coletar stats globais: {e}")
-                except Exception as e:
-                    global_logger.error(
-                        f"Erro inesperado na coleta global: {e}", exc_info=False)
-
-            # --- Coleta e Log por Processo --- (sem alteração)
-            for proc_name in config['MONITORING_PROCESS_NAMES']:
-                # ... (código existente para log de processos específicos) ...
-                proc_logger = loggers.get(proc_name)
-                if proc_logger:
+            # A hora só é conferida quando o prazo agendado (próxima hora cheia) é atingido
+            if time.monotonic() >= next_rotation_check:
+                now = datetime.datetime.now()
+                current_hour_key = get_hour_key(now)
+                if current_hour_key != last_hour_key:
+                    current_timestamp_str = get_timestamp_str(now)
+                    if last_hour_key is None:
+                        # Primeira vez: os loggers precisam existir antes do primeiro log
+                        rotate_loggers(current_timestamp_str, False)
+                        global_logger = loggers.get('global')
+                        topten_logger = loggers.get('topten')
+                    else:
+                        # Rotação em segundo plano: o tick continua usando os handlers atuais até a troca
+                        rotation_executor.submit(rotate_loggers, current_timestamp_str, True)
+                    last_hour_key = current_hour_key
+
+                next_hour = now.replace(minute=0, second=0, microsecond=0) + datetime.timedelta(hours=1)
+                # Limitado a _ROTATION_CHECK_MAX_SECONDS para acompanhar ajustes no relógio do sistema
+                next_rotation_check = time.monotonic() + min(
+                    (next_hour - now).total_seconds(), _ROTATION_CHECK_MAX_SECONDS)
+
+            # O log do tick inteiro é feito sob o lock: uma rotação em andamento só
+            # troca os handlers entre dois ticks
+            with loggers_lock:
+                # --- Log Global ---
+                if global_logger:
                     try:
-                        proc_cpu, proc_mem, pids = get_process_stats(proc_name)
-                        pids_str = ','.join(map(str, pids)) if pids else 'N/A'
-                        extra_data = {'pids': pids_str}
-
-                        if not pids:                            
-                            log_message = f"Processo '{proc_name}' não encontrado ou sem uso de recursos."
-                            print(f"[{datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {log_message}")
-                            #proc_logger.info(log_message, extra=extra_data) # Não loga se não houver PIDs
-                        else:
-                            log_message = f"Uso CPU: {proc_cpu:.1f}% | Uso Memória: {proc_mem:.1f}%"
-                            proc_logger.info(log_message, extra=extra_data)
+                        if stats.system_error:
+                            raise stats.system_error
+                        if global_logger.isEnabledFor(logging.INFO):
+                            cpu, mem = stats.system
+                            global_logger.info(_STATS_FMT, 'N/A', cpu, mem)
                     except StatsCollectionError as e:
-                        proc_logger.error(
-                            f"Falha ao coletar stats para '{proc_name}': {e}")
+                        log_error_throttled(global_logger, 'global', e,
+                                            _NO_PIDS + "Falha ao coletar stats globais: %s", e)
                     except Exception as e:
-                       proc_logger.error(
-                           f"Erro inesperado na coleta de '{proc_name}': {e}", exc_info=False)
-
-            # ---> Coleta e Log Top 10 CPU <---
-            if topten_logger:  # Verifica se o logger topten foi inicializado
-                core_info_line = "Resumo CPU Sistema: Informações indisponíveis"  # Default
-                try:
-                    # ---> 1. Obter informações dos cores/uso sistema <---
-                    core_data = get_core_info()  # Chama a nova função
-                    # Formata os dados obtidos para o log, tratando possíveis Nones (embora a função deva levantar erro)
-                    physical_cores_str = str(core_data.get('physical', '?'))
-                    logical_cores_str = str(core_data.get('logical', '?'))
-                    system_usage_val = core_data.get('system_usage_percent')
-                    system_usage_str = f"{system_usage_val:.1f}%" if system_usage_val is not None else 'N/A'
-                    # Cria a linha de resumo
-                    core_info_line = f"Resumo CPU Sistema: Uso Total {system_usage_str} (Físicos: {physical_cores_str}, Lógicos: {logical_cores_str})"
-                    # -----------------------------------------------------
-
-                    # Coleta os top processos 
-                    top_processes = get_top_processes(10,'mem')
-
-                    # ---> 2. Formata a mensagem completa do log <---
-                    log_lines = [
-                        core_info_line,  # <-- Adiciona a linha de resumo criada acima
-                        "Top 10 Processos por CPU:"
-                    ]
-                    # -------------------------------------------
-                    if top_processes:
-                        for p in top_processes:
+                        log_error_throttled(global_logger, 'global', e,
+                                            _NO_PIDS + "Erro inesperado na coleta global: %s", e)
+
+                # --- Log por Processo (todos os alvos em uma passada sobre o snapshot) ---
+                # (sem nomes configurados, apenas o log global e o Top 10 rodam a cada tick)
+                if monitored_names:
+                    # (o dicionário de totais do tick anterior é reaproveitado)
+                    process_stats_error = stats.processes_error
+                    if not process_stats_error:
+                        try:
+                            all_process_stats = get_all_process_stats(
+                                monitored_names, stats.processes, name_matcher,
+                                all_process_stats)
+                        except StatsCollectionError as e:
+                            process_stats_error = e
+
+                    for proc_name in monitored_names:
+                        # ... (código existente para log de processos específicos) ...
+                        proc_logger = loggers.get(proc_name)
+                        if proc_logger:
+                            try:
+                                if process_stats_error:
+                                    raise process_stats_error
+                                proc_cpu, proc_mem, pids = all_process_stats[proc_name]
+
+                                if not pids:                            
+                                    log_message = f"Processo '{proc_name}' não encontrado ou sem uso de recursos."
+                                    print(f"[{get_console_timestamp()}] {log_message}")
+                                    #proc_logger.info(log_message) # Não loga se não houver PIDs
+                                elif proc_logger.isEnabledFor(logging.INFO):
+                                    # Formatação adiada para o logging (só ocorre se o registro for emitido)
+                                    proc_logger.info(
+                                        _STATS_FMT, ','.join(map(str, pids)), proc_cpu, proc_mem)
+                            except StatsCollectionError as e:
+                                log_error_throttled(proc_logger, proc_name, e,
+                                                    _NO_PIDS + "Falha ao coletar stats para '%s': %s", proc_name, e)
+                            except Exception as e:
+                                log_error_throttled(proc_logger, proc_name, e,
+                                                    _NO_PIDS + "Erro inesperado na coleta de '%s': %s", proc_name, e)
+
+                # ---> Coleta e Log Top 10 CPU <---
+                if topten_logger:  # Verifica se o logger topten foi inicializado
+                    core_info_line = "Resumo CPU Sistema: Informações indisponíveis"  # Default
+                    try:
+                        # ---> 1. Obter informações dos cores/uso sistema <---
+                        if stats.core_error:
+                            raise stats.core_error
+                        core_data = stats.core_info
+                        # Formata os dados obtidos para o log, tratando possíveis Nones (embora a função deva levantar erro)
+                        physical_cores_str = str(core_data.get('physical', '?'))
+                        logical_cores_str = str(core_data.get('logical', '?'))
+                        system_usage_val = core_data.get('system_usage_percent')
+                        system_usage_str = f"{system_usage_val:.1f}%" if system_usage_val is not None else 'N/A'
+                        # Cria a linha de resumo
+                        core_info_line = f"Resumo CPU Sistema: Uso Total {system_usage_str} (Físicos: {physical_cores_str}, Lógicos: {logical_cores_str})"
+                        # -----------------------------------------------------
+
+                        # Coleta os top processos 
+                        if stats.processes_error:
+                            raise stats.processes_error
+                        top_processes = get_top_processes(10, 'mem', stats.processes)
+
+                        # ---> 2. Formata a mensagem completa do log <---
+                        log_lines = [
+                            _NO_PIDS + core_info_line,  # <-- Adiciona a linha de resumo criada acima
+                            "Top 10 Processos por CPU:"
+                        ]
+                        # -------------------------------------------
+                        if top_processes:
+                            for p in top_processes:
+                                log_lines.append(
+                                    _TOP_FMT % (p['pid'], p['cpu'], p['mem'], p['name']))
+                        else:
                             log_lines.append(
-                                f"  - PID: {p['pid']:<6} | CPU: {p['cpu']:>5.1f}% | Mem: {p['mem']:>5.1f}% | Nome: {p['name']}")
-                    else:
-                        log_lines.append(
-                            "  (Nenhum processo encontrado ou erro na coleta)")
-
-                    log_message = " $:".join(log_lines)
-                    topten_logger.info(log_message)
-
-                # ---> 3. Atualiza tratamento de erro para incluir CoreInfoError <---
-                except CoreInfoError as e:
-                    # Loga erro específico da coleta de info de cores e continua para Top 10 se possível
-                    # (Ou loga apenas o erro e pula o log do Top 10 nesta iteração)
-                    topten_logger.error(
-                        f"Falha ao obter informações dos Cores/Uso CPU: {e}")
-                    # Opcional: Tentar logar o Top10 mesmo sem a info dos cores?
-                    # Se sim, precisaria reestruturar o try/except ou logar a lista 'log_lines' aqui
-                    # Vamos manter simples: se falhar em obter core_info, apenas loga o erro.
-                except StatsCollectionError as e:
-                    # Loga erros específicos da coleta Top 10 (se core_info funcionou)
-                    # Inclui info dos cores no erro
-                    topten_logger.error(
-                        f"Falha ao obter Top 10 processos: {e}\n{core_info_line}")
-                except Exception as e:
-                    # Loga outros erros inesperados
-                    topten_logger.error(
-                        f"Erro inesperado na seção Top 10: {e}\n{core_info_line}", exc_info=False)
-
-
-            # --- Espera --- (sem alteração)
-            time.sleep(config['MONITOR_INTERVAL_SECONDS'])
+                                "  (Nenhum processo encontrado ou erro na coleta)")
+
+                        log_message = " $:".join(log_lines)
+                        topten_logger.info(log_message)
+
+                    # ---> 3. Atualiza tratamento de erro para incluir CoreInfoError <---
+                    except CoreInfoError as e:
+                        # Loga erro específico da coleta de info de cores e continua para Top 10 se possível
+                        # (Ou loga apenas o erro e pula o log do Top 10 nesta iteração)
+                        log_error_throttled(topten_logger, 'topten', e,
+                                            _NO_PIDS + "Falha ao obter informações dos Cores/Uso CPU: %s", e)
+                        # Opcional: Tentar logar o Top10 mesmo sem a info dos cores?
+                        # Se sim, precisaria reestruturar o try/except ou logar a lista 'log_lines' aqui
+                        # Vamos manter simples: se falhar em obter core_info, apenas loga o erro.
+                    except StatsCollectionError as e:
+                        # Loga erros específicos da coleta Top 10 (se core_info funcionou)
+                        # Inclui info dos cores no erro
+                        log_error_throttled(topten_logger, 'topten', e,
+                                            _NO_PIDS + "Falha ao obter Top 10 processos: %s\n%s", e, core_info_line)
+                    except Exception as e:
+                        # Loga outros erros inesperados
+                        log_error_throttled(topten_logger, 'topten', e,
+                                            _NO_PIDS + "Erro inesperado na seção Top 10: %s\n%s", e, core_info_line)
+
+
+                # --- Descarrega os logs do tick: uma escrita por arquivo ---
+                flush_loggers(loggers)
 
     # ... (blocos except KeyboardInterrupt, Exception e finally sem alteração) ...
     except KeyboardInterrupt:
         print("\nMonitoramento interrompido pelo usuário (Ctrl+C).")
         if global_logger:
             global_logger.warning(
-                "Monitoramento interrompido (KeyboardInterrupt).")
+                _NO_PIDS + "Monitoramento interrompido (KeyboardInterrupt).")
     except Exception as e:
         errmsg = f"ERRO CRÍTICO NO LOOP PRINCIPAL: {e}"
         print(f"\n{errmsg}", file=sys.stderr)
         if global_logger:
-            global_logger.critical(errmsg, exc_info=True)
+            global_logger.critical(f"{_NO_PIDS}{errmsg}", exc_info=True)
     finally:
-        # ... (código finally sem alteração) ...
+        # Sinaliza o encerramento para a thread coletora
+        stop_event.set()
+        collector.join(timeout=5)
+        rotation_executor.shutdown(wait=True)
         print("Finalizando ProcMon.")
-        # Itera sobre cópia dos valores
-        for logger_instance in list(loggers.values()):
-            for handler in list(logger_instance.handlers):
-                if isinstance(handler, logging.FileHandler):
-                    handler.close()
-                    logger_instance.removeHandler(handler)
-        # Log final apenas se o logger global existe
-        if 'global' in loggers and loggers['global'].handlers:
-            loggers['global'].info("Monitoramento finalizado.")
-        elif global_logger:  # Fallback se o logger global foi criado mas saiu do dict
-            global_logger.info("Monitoramento finalizado.")
+        # Log final antes de fechar os handlers (apenas se o logger global existe)
+        if global_logger:
+            if dropped_snapshots:
+                global_logger.warning(
+                    f"{_NO_PIDS}{dropped_snapshots} coleta(s) descartada(s): o log não acompanhou o intervalo de monitoramento.")
+            global_logger.info(_NO_PIDS + "Monitoramento finalizado.")
+        # Fecha cada handler diretamente pela referência guardada
+        for name, (_, handler) in list(current_log_filenames.items()):
+            loggers[name].removeHandler(handler)
+            try:
+                handler.close()
+            except Exception as e:
+                print(f"ERRO ao fechar o log '{name}': {e}", file=sys.stderr)
+        current_log_filenames.clear()
 
 # --- Ponto de Entrada Principal ---
 if __name__ == "__main__":
@@ -14,7 +14,11 @@ import os
 import sys
 import re
 
-from tabulate import tabulate  
+# Expressões regulares pré-compiladas (usadas a cada arquivo/linha de log)
+# (re.ASCII: \d e \s só precisam casar ASCII, o que simplifica o casamento)
+_PIDS_RE = re.compile(r'PIDs\[([^\]]*)\]', re.ASCII)
+_CPU_RE = re.compile(r'Uso CPU:\s*([\d.]+)%', re.ASCII)
+_MEM_RE = re.compile(r'Uso Memória:\s*([\d.]+)%', re.ASCII)
 
 # Funções movidas de procmon.py (adaptadas para receber config)
 
@@ -32,7 +36,6 @@ def find_latest_log(log_path, filename_template, target_name):
     file_prefix = f"{target_name}_" if target_name != "global" else ""
     full_prefix = file_prefix + pattern_part
     latest_file = None
-    latest_timestamp = ""
 
     try:
         # Verifica se o diretório de log existe antes de listar
@@ -40,14 +43,20 @@ def find_latest_log(log_path, filename_template, target_name):
             print(
                 f"AVISO: Diretório de logs não encontrado: {log_path}", file=sys.stderr)
             return None
-        for filename in os.listdir(log_path):
-            if filename.startswith(full_prefix) and filename.endswith(".log"):
-                match = re.search(r'(\d{12})', filename)
-                if match:
-                    timestamp = match.group(1)
-                    if timestamp > latest_timestamp:
-                        latest_timestamp = timestamp
-                        latest_file = os.path.join(log_path, filename)
+        # O timestamp YYYYMMDDHHMM fica em posição fixa, logo após o prefixo:
+        # basta fatiar o nome (sem regex) e guardar o maior em uma única passada.
+        ts_start = len(full_prefix)
+        ts_end = ts_start + 12
+        latest_timestamp = ""
+        with os.scandir(log_path) as entries:
+            for entry in entries:
+                filename = entry.name
+                if not (filename.startswith(full_prefix) and filename.endswith(".log")):
+                    continue
+                timestamp = filename[ts_start:ts_end]
+                if timestamp.isdigit() and timestamp > latest_timestamp:
+                    latest_timestamp = timestamp
+                    latest_file = entry.path
     except Exception as e:
         print(
             f"ERRO ao procurar logs para '{target_name}': {e}", file=sys.stderr)
@@ -57,12 +66,28 @@ def find_latest_log(log_path, filename_template, target_name):
 
 
 def read_last_log_entries(log_file, num_entries=5):
-    """Lê as últimas N entradas de um arquivo de log."""
+    """
+    Lê as últimas N entradas de um arquivo de log.
+    Lê o arquivo de trás para frente em blocos (como o 'tail'), sem carregá-lo inteiro.
+    """
     try:
-        with open(log_file, 'r', encoding='utf-8') as f:
-            lines = f.readlines()
-            # Retorna as últimas N linhas ou todas se houver menos que N
-            return lines[-num_entries:]
+        with open(log_file, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            block_size = 8192
+            blocks = []
+            newlines = 0
+            # N entradas exigem N+1 quebras de linha (a última linha termina com '\n')
+            while pos > 0 and newlines <= num_entries:
+                read_size = min(block_size, pos)
+                pos -= read_size
+                f.seek(pos)
+                block = f.read(read_size)
+                newlines += block.count(b'\n')
+                blocks.append(block)
+        data = b''.join(reversed(blocks))
+        # Retorna as últimas N linhas ou todas se houver menos que N
+        return data.decode('utf-8', 'replace').splitlines()[-num_entries:]
     except FileNotFoundError:
         # find_latest_log já deve ter prevenido isso, mas é bom verificar
         print(
@@ -76,15 +101,21 @@ def read_last_log_entries(log_file, num_entries=5):
 
 def parse_log_line(line):
     """Extrai dados de uma linha de log formatada (incluindo PIDs)."""
-    parts = line.split(' :: ')
+    # Limita a 4 partes: a mensagem (última parte) não precisa ser varrida
+    parts = line.split(' :: ', 3)
     if len(parts) == 4:
         timestamp_str = parts[0]
         # level = parts[1] # Não usamos level na tabela
-        pids_match = re.search(r'PIDs\[(.*)\]', parts[2])
+        pids_match = _PIDS_RE.search(parts[2])
         pids_str = pids_match.group(1) if pids_match else 'N/A'
         message = parts[3].strip()
-        cpu_match = re.search(r'Uso CPU:\s*([\d.]+)\%', message)
-        mem_match = re.search(r'Uso Memória:\s*([\d.]+)\%', message)
+        # Caminho rápido: formato emitido pelo próprio ProcMon ("Uso CPU: X% | Uso Memória: Y%")
+        if message.startswith('Uso CPU: '):
+            cpu_part, sep, mem_part = message.partition(' | Uso Memória: ')
+            if sep and cpu_part.endswith('%') and mem_part.endswith('%'):
+                return timestamp_str, pids_str, cpu_part[9:-1], mem_part[:-1]
+        cpu_match = _CPU_RE.search(message)
+        mem_match = _MEM_RE.search(message)
         cpu = cpu_match.group(1) if cpu_match else 'N/A'
         mem = mem_match.group(1) if mem_match else 'N/A'
         return timestamp_str, pids_str, cpu, mem
@@ -93,6 +124,8 @@ def parse_log_line(line):
 
 def display_log_summary(log_path, filename_template, target_name):
     """Exibe as últimas entradas de log para um alvo em formato de tabela."""
+    from tabulate import tabulate  # Importado aqui: só é necessário nesta opção da CLI
+
     latest_log = find_latest_log(log_path, filename_template, target_name)
     if not latest_log:
         print(f"Nenhum arquivo de log encontrado para '{target_name}'.")
@@ -10,15 +10,178 @@
  
  *Copyright (c) 2025, NatanFiuza.dev.br*
 """
+import locale
 import logging
+import logging.handlers
+import os
 
-class PidFilter(logging.Filter):
+class CachedTimeFormatter(logging.Formatter):
     """
-    Filtro de logging que adiciona um atributo 'pids' com valor 'N/A'
-    ao LogRecord se ele ainda não existir.
+    Formatter que reaproveita o asctime já formatado enquanto o segundo não muda.
+    Todos os loggers registram no mesmo instante a cada tick, então localtime/strftime
+    passam a rodar uma vez por segundo em vez de uma vez por registro.
+    Requer um datefmt com resolução de segundos (sem milissegundos).
     """
 
-    def filter(self, record):
-        if not hasattr(record, 'pids'):
-            record.pids = 'N/A'  # Define o valor padrão
-        return True  # Sempre retorna True para que o log seja processado
+    def __init__(self, fmt=None, datefmt=None):
+        super().__init__(fmt, datefmt)
+        self._time_cache = (None, '')  # (segundo, asctime), trocado atomicamente
+
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, cached_asctime = self._time_cache
+        if second == cached_second:
+            return cached_asctime
+        asctime = super().formatTime(record, datefmt)
+        self._time_cache = (second, asctime)
+        return asctime
+
+
+class BufferedFileHandler(logging.handlers.RotatingFileHandler):
+    """
+    FileHandler que acumula os registros formatados em memória (até 64 KB por padrão)
+    em vez de escrever o arquivo a cada registro. O acumulado é codificado e gravado
+    com um único write() direto no descritor do arquivo (aberto com O_APPEND, sem o
+    TextIOWrapper/buffer do Python) quando enche, em registros de nível >= flush_level,
+    quando flush() é chamado (uma vez por tick pelo loop principal) e ao fechar o
+    handler (rotação horária/encerramento).
+
+    Com max_bytes > 0 e backup_count > 0 o arquivo também é rotacionado por tamanho (arquivo.log.1, .2, ...),
+    como no RotatingFileHandler. O tamanho é contado em memória (aproximado, em
+    caracteres) para não forçar um flush a cada registro.
+    """
+
+    # Limite (em múltiplos de buffer_size) do que é guardado para nova tentativa após falhas de escrita
+    _MAX_UNWRITTEN_BUFFERS = 16
+
+    def __init__(self, filename, mode='a', encoding=None, buffer_size=64 * 1024,
+                 flush_level=logging.CRITICAL, max_bytes=0, backup_count=0):
+        self.buffer_size = buffer_size
+        self.flush_level = flush_level
+        self._pending = []      # Registros formatados ainda não gravados
+        self._pending_size = 0  # Em caracteres
+        self._unwritten = b''   # Bytes de um flush que falhou (gravados antes dos próximos registros)
+        super().__init__(filename, mode=mode, maxBytes=max_bytes,
+                         backupCount=backup_count, encoding=encoding)
+        # (o FileHandler troca encoding=None por 'locale', que não serve para str.encode)
+        if self.encoding in (None, 'locale'):
+            self.encoding = locale.getpreferredencoding(False)
+        self._size = self._current_size()
+
+    def _open(self):
+        # Arquivo binário sem buffer: cada write() vai direto para o descritor (O_APPEND no modo 'a')
+        return open(self.baseFilename, self.mode.replace('b', '') + 'b', buffering=0)
+
+    def _current_size(self):
+        try:
+            return os.path.getsize(self.baseFilename)
+        except OSError:
+            return 0
+
+    def shouldRollover(self, record):
+        # Sem backups (backup_count=0) não há para onde rotacionar: o arquivo apenas cresce
+        # (rotacionar reabriria o mesmo arquivo a cada registro, perdendo o buffer)
+        return self.maxBytes > 0 and self.backupCount > 0 and self._size >= self.maxBytes
+
+    def doRollover(self):
+        self.flush()  # Grava o acumulado no arquivo atual antes de renomeá-lo
+        super().doRollover()
+        self._size = self._current_size()
+
+    def flush(self):
+        with self.lock:
+            if self.stream is None or not (self._pending or self._unwritten):
+                return
+            data = self._unwritten
+            if self._pending:
+                text = ''.join(self._pending)
+                if os.linesep != '\n':
+                    # Mesma tradução do modo texto: '\n' vira '\r\n' no Windows (inclusive dentro das mensagens)
+                    text = text.replace('\n', os.linesep)
+                # (nomes de processo podem trazer bytes inválidos: são escapados em vez de travar o buffer)
+                data += text.encode(self.encoding, self.errors or 'backslashreplace')
+            view = memoryview(data)
+            try:
+                # write() pode gravar parcialmente: repete até esgotar os dados
+                while view:
+                    written = self.stream.write(view)
+                    view = view[written:]
+            except BaseException:
+                # Guarda o trecho ainda não gravado para o próximo flush (acima de
+                # _MAX_UNWRITTEN_BUFFERS buffers é descartado, para não crescer sem limite)
+                remaining = bytes(view)
+                if len(remaining) > self.buffer_size * self._MAX_UNWRITTEN_BUFFERS:
+                    remaining = b''
+                self._unwritten = remaining
+                self._pending.clear()
+                self._pending_size = 0
+                raise
+            self._unwritten = b''
+            self._pending.clear()
+            self._pending_size = 0
+
+    def emit(self, record):
+        try:
+            if self.shouldRollover(record):
+                self.doRollover()
+            if self.stream is None:
+                self.stream = self._open()
+            msg = self.format(record) + self.terminator
+            self._pending.append(msg)
+            self._pending_size += len(msg)
+            self._size += len(msg)
+            if record.levelno >= self.flush_level or self._pending_size >= self.buffer_size:
+                self.flush()
+        except RecursionError:
+            raise
+        except Exception:
+            self.handleError(record)
+
+
+class ProcessSnapshot:
+    """
+    Resultado de uma varredura de processos, armazenado como listas paralelas
+    (o mesmo índice em cada lista corresponde ao mesmo processo).
+    Evita criar um dicionário por processo a cada tick; os consumidores
+    percorrem apenas as colunas de que precisam.
+    """
+    __slots__ = ('pids', 'names', 'names_lower', 'cpu', 'mem')
+
+    def __init__(self):
+        self.pids = []
+        self.names = []
+        self.names_lower = []
+        self.cpu = []
+        self.mem = []
+
+    def append(self, pid, name, cpu, mem, name_lower=None):
+        """
+        Adiciona um processo. cpu/mem podem ser None se o acesso foi negado.
+        name_lower pode ser informado quando já houver o nome em minúsculas em cache.
+        """
+        self.pids.append(pid)
+        self.names.append(name)
+        self.names_lower.append(name_lower if name_lower is not None else name.lower())
+        self.cpu.append(cpu)
+        self.mem.append(mem)
+
+    def __len__(self):
+        return len(self.pids)
+
+
+class StatsSnapshot:
+    """
+    Resultado de uma coleta completa (um tick), produzido pela thread coletora
+    e consumido pelo loop de log. Para cada parte guarda o valor obtido ou a
+    exceção levantada na coleta (o consumidor decide como registrá-la).
+    """
+    __slots__ = ('system', 'system_error', 'processes', 'processes_error',
+                 'core_info', 'core_error')
+
+    def __init__(self):
+        self.system = None           # (cpu, mem) de get_system_stats()
+        self.system_error = None
+        self.processes = None        # ProcessSnapshot de scan_all_processes()
+        self.processes_error = None
+        self.core_info = None        # dict de get_core_info()
+        self.core_error = None
@@ -11,10 +11,24 @@
  *Copyright (c) 2025, NatanFiuza.dev.br*
 """
 import logging
+import concurrent.futures
+import contextlib
 import datetime
+import functools
+import heapq
 import os
+import sys
+import time
+import re
 import psutil  
 
+try:
+    import ahocorasick  # pyahocorasick (opcional): casamento de vários nomes em uma passada
+except ImportError:
+    ahocorasick = None
+
+from procmon_models import BufferedFileHandler, CachedTimeFormatter, ProcessSnapshot, StatsSnapshot
+
 # Exceção customizada 
 class StatsCollectionError(Exception):
     pass
@@ -23,9 +37,39 @@ class CoreInfoError(Exception):
     pass
 
 
-def get_timestamp_str():
-    """Retorna o timestamp atual no formato YYYYMMDDHHMM."""
-    return datetime.datetime.now().strftime("%Y%m%d%H%M")
+def get_timestamp_str(now=None):
+    """Retorna o timestamp (atual ou de 'now') no formato YYYYMMDDHHMM."""
+    if now is None:
+        now = datetime.datetime.now()
+    return now.strftime("%Y%m%d%H%M")
+
+
+# Último timestamp de console formatado: (segundo, texto), trocado atomicamente
+_console_ts_cache = (None, '')
+
+
+def get_console_timestamp():
+    """
+    Retorna o instante atual como 'YYYY-MM-DD HH:MM:SS' para as mensagens de console.
+    O texto é reaproveitado enquanto o segundo não muda (strftime roda uma vez por segundo).
+    """
+    global _console_ts_cache
+    now = time.time()
+    second = int(now)
+    cached_second, cached_str = _console_ts_cache
+    if second == cached_second:
+        return cached_str
+    ts_str = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(second))
+    _console_ts_cache = (second, ts_str)
+    return ts_str
+
+
+def get_hour_key(now):
+    """
+    Retorna a hora de 'now' como inteiro YYYYMMDDHH, usado para detectar a troca de hora
+    a cada tick sem formatar strings (strftime só é necessário quando a hora muda).
+    """
+    return now.year * 1000000 + now.month * 10000 + now.day * 100 + now.hour
 
 
 def get_log_filename(log_path, template, timestamp_str, process_name=None):
@@ -36,55 +80,168 @@ def get_log_filename(log_path, template, timestamp_str, process_name=None):
     return os.path.join(log_path, filename)
 
 
-def setup_logger(name, log_file, loggers_dict, filenames_dict, filter_instance):
+# Os registros não usam thread/processo no formato: evita get_ident()/getpid() a cada registro
+logging.logThreads = False
+logging.logProcesses = False
+logging.logMultiprocessing = False
+
+# Formato das mensagens, compartilhado por todos os handlers para que o asctime em
+# cache sirva a todos os loggers do mesmo tick. O trecho "PIDs[...] :: " já vem na mensagem.
+_LOG_FORMATTER = CachedTimeFormatter(
+    '%(asctime)s :: %(levelname)s :: %(message)s', datefmt='%Y-%m-%d %H:%M:%S')
+
+
+def setup_logger(name, log_file, loggers_dict, filenames_dict, lock=None,
+                 max_bytes=0, backup_count=0):
     """
     Configura e retorna um logger para um arquivo específico,
-    gerenciando dicionários de loggers e nomes de arquivos.
-    """
-    logger = loggers_dict.get(name)
-    if logger:
-        # Remover handler antigo se o nome base for o mesmo (evita duplicatas ao rotacionar)
-        for handler in list(logger.handlers):
-            if isinstance(handler, logging.FileHandler) and handler.baseFilename == filenames_dict.get(name):
-                handler.close()
-                logger.removeHandler(handler)
-    else:
-        logger = logging.getLogger(name)
-        logger.setLevel(logging.INFO)
-        logger.propagate = False
-
-    # Adiciona o filtro para garantir 'pids' (apenas uma vez)
-    if filter_instance and filter_instance not in logger.filters:
-        logger.addFilter(filter_instance)
-
-    # Configura o formato da mensagem (com %(pids)s)
-    log_format = '%(asctime)s :: %(levelname)s :: PIDs[%(pids)s] :: %(message)s'
-    formatter = logging.Formatter(log_format, datefmt='%Y-%m-%d %H:%M:%S')
-
-    # Configura o FileHandler
-    file_handler = logging.FileHandler(log_file, encoding='utf-8')
-    file_handler.setFormatter(formatter)
-
-    # Adiciona o handler ao logger (evita duplicatas)
-    handler_exists = any(
-        isinstance(h, logging.FileHandler) and h.baseFilename == log_file
-        for h in logger.handlers
-    )
-    if not handler_exists:
+    gerenciando dicionários de loggers e de arquivos atuais.
+    filenames_dict guarda, para cada logger, a tupla (arquivo, handler) em uso.
+
+    Se 'lock' for informado, apenas a troca de handlers é feita sob ele: o novo arquivo
+    é aberto antes e o handler antigo é descarregado/fechado depois, fora do lock.
+    max_bytes/backup_count ativam a rotação por tamanho dentro da hora (0 = desativada).
+    """
+    # Configura o FileHandler com escrita bufferizada (descarregado na rotação/encerramento)
+    file_handler = BufferedFileHandler(
+        log_file, encoding='utf-8', max_bytes=max_bytes, backup_count=backup_count)
+    file_handler.setFormatter(_LOG_FORMATTER)
+
+    old_handler = None
+    with lock if lock is not None else contextlib.nullcontext():
+        logger = loggers_dict.get(name)
+        if logger:
+            # Remove o handler anterior pela referência guardada (evita duplicatas ao rotacionar)
+            current = filenames_dict.get(name)
+            if current:
+                _, old_handler = current
+                logger.removeHandler(old_handler)
+        else:
+            logger = logging.getLogger(name)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+
         logger.addHandler(file_handler)
 
-    # Atualiza os dicionários de estado
-    loggers_dict[name] = logger
-    filenames_dict[name] = log_file
+        # Atualiza os dicionários de estado
+        loggers_dict[name] = logger
+        filenames_dict[name] = (log_file, file_handler)
+
+    if old_handler:
+        # O novo handler já está em uso: uma falha ao fechar o antigo (ex.: último flush)
+        # é apenas reportada, sem interromper a rotação dos demais loggers
+        try:
+            old_handler.close()
+        except Exception as e:
+            print(f"ERRO ao fechar o log anterior de '{name}' ({old_handler.baseFilename}): {e}",
+                  file=sys.stderr)
     return logger
 
 
+def flush_loggers(loggers_dict):
+    """
+    Descarrega os buffers de todos os handlers de uma só vez (chamado uma vez por tick),
+    resultando em no máximo uma escrita por arquivo de log a cada intervalo.
+    Falhas de escrita (disco cheio, caminho de rede indisponível...) são apenas reportadas
+    no stderr: uma falha de log nunca interrompe o monitoramento.
+    """
+    for name, logger in loggers_dict.items():
+        for handler in logger.handlers:
+            try:
+                handler.flush()
+            except Exception as e:
+                print(f"ERRO ao gravar o log '{name}' ({getattr(handler, 'baseFilename', '?')}): {e}",
+                      file=sys.stderr)
+
+
+# Linux: /proc/meminfo fica aberto e é relido (seek + read) a cada tick.
+# Passa a None definitivamente se o arquivo não puder ser usado (volta ao psutil).
+_meminfo_file = None
+_meminfo_available = sys.platform.startswith('linux')
+
+
+def _read_meminfo():
+    """
+    Lê MemTotal e MemAvailable (em bytes) direto do /proc/meminfo, sem montar o
+    namedtuple completo de psutil.virtual_memory(). Retorna None fora do Linux
+    ou se o arquivo não puder ser lido/interpretado.
+    """
+    global _meminfo_file, _meminfo_available
+    if not _meminfo_available:
+        return None
+    try:
+        if _meminfo_file is None:
+            _meminfo_file = open('/proc/meminfo', 'rb')
+        _meminfo_file.seek(0)
+        buf = _meminfo_file.read(1024)
+        total_start = buf.index(b'MemTotal:') + 9
+        avail_start = buf.index(b'MemAvailable:') + 13
+        total = int(buf[total_start:buf.index(b'\n', total_start)].split()[0]) * 1024
+        available = int(buf[avail_start:buf.index(b'\n', avail_start)].split()[0]) * 1024
+        return total, available
+    except (OSError, ValueError, IndexError):
+        _meminfo_available = False
+        return None
+
+
+# Linux: /proc/stat também fica aberto (sem buffer: cada leitura é um único read());
+# _stat_prev guarda (tempo ocupado, tempo total) da leitura anterior, em ticks
+_stat_file = None
+_stat_available = sys.platform.startswith('linux')
+_stat_prev = None
+
+
+def _read_cpu_percent():
+    """
+    Calcula o uso total da CPU (%) desde a leitura anterior a partir da linha 'cpu' do
+    /proc/stat (mesmo cálculo do psutil.cpu_percent(interval=None) no Linux).
+    Retorna None fora do Linux ou se o arquivo não puder ser lido/interpretado.
+    """
+    global _stat_file, _stat_available, _stat_prev
+    if not _stat_available:
+        return None
+    try:
+        if _stat_file is None:
+            _stat_file = open('/proc/stat', 'rb', buffering=0)
+        _stat_file.seek(0)
+        buf = _stat_file.read(512)
+        # cpu user nice system idle iowait irq softirq steal [guest guest_nice (já contidos em user/nice)]
+        times = [int(v) for v in buf[:buf.index(b'\n')].split()[1:9]]
+        total = sum(times)
+        busy = total - times[3] - times[4]
+    except (OSError, ValueError, IndexError):
+        _stat_available = False
+        return None
+
+    prev = _stat_prev
+    _stat_prev = (busy, total)
+    if prev is None:
+        return 0.0  # Primeira leitura: ainda não há intervalo a comparar
+    total_delta = total - prev[1]
+    if total_delta <= 0:
+        return 0.0
+    busy_percent = (busy - prev[0]) / total_delta * 100.0
+    return round(min(max(busy_percent, 0.0), 100.0), 1)
+
+
+# Leitura inicial: a primeira medição do tick já compara com este instante, sem bloquear
+if _read_cpu_percent() is None:
+    psutil.cpu_percent(interval=None)
+
+
 def get_system_stats():
     """Coleta estatísticas globais de CPU e memória. Levanta StatsCollectionError em caso de falha."""
     try:
-        cpu_usage = psutil.cpu_percent(interval=None)
-        memory_info = psutil.virtual_memory()
-        memory_usage_percent = memory_info.percent
+        cpu_usage = _read_cpu_percent()
+        if cpu_usage is None:
+            cpu_usage = psutil.cpu_percent(interval=None)
+        meminfo = _read_meminfo()
+        if meminfo:
+            total, available = meminfo
+            # Mesmo cálculo do psutil.virtual_memory().percent no Linux
+            memory_usage_percent = (total - available) / total * 100.0
+        else:
+            memory_usage_percent = psutil.virtual_memory().percent
         return cpu_usage, memory_usage_percent
     except Exception as e:
         # Levanta uma exceção específica em vez de logar aqui
@@ -92,42 +249,296 @@ def get_system_stats():
             f"Erro ao coletar estatísticas GLOBAIS: {e}") from e
 
 
-def get_process_stats(process_name):
+# Cache indexado por PID, reaproveitado entre os ticks: {pid: (Process, nome, nome_minusculo)}.
+# Reusar o mesmo objeto faz cpu_percent() medir o uso desde o tick anterior; o nome é
+# relido a cada tick e só é convertido para minúsculas de novo quando muda.
+_proc_cache = {}
+# A cada N varreduras confere se cada PID em cache ainda é o mesmo processo (reuso de PID)
+_PROC_CACHE_CHECK_EVERY = 60
+_scan_count = 0
+
+# Estado da leitura direta do /proc (Linux): {pid: (starttime, ticks_cpu)} do tick anterior
+_procfs_prev = {}
+_procfs_prev_time = None
+# Pool de threads da varredura paralela do /proc (criado sob demanda)
+_procfs_executor = None
+
+
+def _read_procfs_stats(pids):
     """
-    Coleta estatísticas de CPU/memória e PIDs para processos cujo nome contém process_name.
-    Levanta StatsCollectionError em caso de falha na iteração. Retorna (0, 0, []) se não encontrado.
+    Lê /proc/<pid>/stat de cada PID informado.
+
+    Returns:
+        list: Tuplas (pid, nome, ticks_cpu, starttime, rss_em_paginas) dos PIDs que ainda existem.
+    """
+    results = []
+    for pid in pids:
+        try:
+            with open(f'/proc/{pid}/stat', 'rb') as f:
+                data = f.read()
+        except (FileNotFoundError, ProcessLookupError, PermissionError):
+            continue  # Processo terminou ou é inacessível
+
+        # O nome fica entre parênteses e pode conter espaços: usa o último ')'
+        lpar = data.find(b'(')
+        rpar = data.rfind(b')')
+        name = data[lpar + 1:rpar].decode('utf-8', 'replace')
+        fields = data[rpar + 2:].split()
+        # Campos (1-based em proc(5)): utime=14, stime=15, starttime=22, rss=24
+        results.append((pid, name, int(fields[11]) + int(fields[12]), int(fields[19]), int(fields[21])))
+    return results
+
+
+def _scan_procfs(workers=1):
+    """
+    Varredura rápida para Linux: lê apenas /proc/<pid>/stat de cada processo
+    (um open/read por PID, contra vários arquivos por PID no psutil).
+    Com workers > 1 os PIDs são divididos em blocos lidos em paralelo por um pool
+    de threads (as leituras do /proc liberam o GIL durante a syscall).
+
+    O %CPU é calculado pela diferença de utime+stime desde o tick anterior, com a mesma
+    semântica do psutil.Process.cpu_percent() (0.0 na primeira leitura do PID).
+    Obs.: o nome vem do campo 'comm' do kernel, limitado a 15 caracteres.
+
+    Args:
+        workers (int): Número de threads de leitura (1 = sequencial).
+
+    Returns:
+        ProcessSnapshot: Listas paralelas com PID, nome, %CPU e %memória de cada processo.
+
+    Raises:
+        OSError: Se o /proc não puder ser lido.
+    """
+    global _procfs_prev, _procfs_prev_time, _procfs_executor
+
+    clk_tck = os.sysconf('SC_CLK_TCK')
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    meminfo = _read_meminfo()
+    total_mem = meminfo[0] if meminfo else psutil.virtual_memory().total
+
+    with os.scandir('/proc') as entries:
+        pids = [int(entry.name) for entry in entries if entry.name.isdigit()]
+
+    if workers > 1:
+        if _procfs_executor is None:
+            _procfs_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix='procmon-procfs')
+        # Blocos contíguos preservam a ordem dos PIDs no resultado
+        chunk_size = -(-len(pids) // workers)
+        chunks = [pids[i:i + chunk_size] for i in range(0, len(pids), chunk_size)]
+        stats = [item for chunk in _procfs_executor.map(_read_procfs_stats, chunks) for item in chunk]
+    else:
+        stats = _read_procfs_stats(pids)
+
+    now = time.monotonic()
+    elapsed = now - _procfs_prev_time if _procfs_prev_time is not None else 0.0
+    current = {}
+    snapshot = ProcessSnapshot()
+
+    for pid, name, ticks, starttime, rss_pages in stats:
+        current[pid] = (starttime, ticks)
+
+        cpu = 0.0
+        prev = _procfs_prev.get(pid)
+        if prev is not None and prev[0] == starttime and elapsed > 0:
+            cpu = (ticks - prev[1]) / clk_tck / elapsed * 100.0
+
+        if not name:
+            continue
+        snapshot.append(pid, name, cpu, rss_pages * page_size / total_mem * 100.0)
+
+    _procfs_prev = current
+    _procfs_prev_time = now
+    return snapshot
+
+
+def scan_all_processes(use_procfs=False, procfs_workers=1):
+    """
+    Varre todos os processos do sistema UMA única vez.
+    Os objetos psutil.Process (com o nome em minúsculas) são mantidos em cache por PID, de
+    modo que só PIDs novos são instanciados; PIDs que desapareceram são descartados do
+    cache. Como o objeto é reaproveitado, o %CPU é o uso desde a varredura anterior
+    (0.0 na primeira vez).
+
+    Args:
+        use_procfs (bool): No Linux, lê o /proc diretamente (ver _scan_procfs) em vez do psutil.
+                           Em outras plataformas ou em caso de falha, usa o psutil.
+        procfs_workers (int): Threads de leitura do /proc quando use_procfs está ativo.
+
+    Returns:
+        ProcessSnapshot: Listas paralelas com PID, nome, %CPU e %memória de cada processo.
+
+    Raises:
+        StatsCollectionError: Se ocorrer um erro significativo durante a varredura.
     """
-    total_cpu = 0.0
-    total_mem_percent = 0.0
-    pids_found = []
-    process_found = False
+    if use_procfs and sys.platform.startswith('linux'):
+        try:
+            return _scan_procfs(procfs_workers)
+        except (OSError, ValueError, IndexError):
+            pass  # Cai para a varredura via psutil
+
+    global _scan_count
+
+    snapshot = ProcessSnapshot()
     try:
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
+        live_pids = psutil.pids()
+        # Remove do cache os PIDs que não existem mais
+        live_set = set(live_pids)
+        for pid in list(_proc_cache):
+            if pid not in live_set:
+                del _proc_cache[pid]
+
+        # Periodicamente descarta objetos cujo PID foi reutilizado (is_running compara o create_time)
+        _scan_count += 1
+        if _scan_count % _PROC_CACHE_CHECK_EVERY == 0:
+            for pid, (proc, _, _) in list(_proc_cache.items()):
+                try:
+                    if proc.is_running():
+                        continue
+                except (psutil.NoSuchProcess, psutil.ZombieProcess):
+                    pass
+                del _proc_cache[pid]
+
+        for pid in live_pids:
             try:
-                if proc.info['name'] and process_name.lower() in proc.info['name'].lower():
-                    process_found = True
-                    pids_found.append(proc.info['pid'])
-                    total_cpu += proc.info['cpu_percent'] if proc.info['cpu_percent'] is not None else 0.0
-                    total_mem_percent += proc.info['memory_percent'] if proc.info['memory_percent'] is not None else 0.0
+                entry = _proc_cache.get(pid)
+                if entry is None:
+                    entry = (psutil.Process(pid), None, None)
+                proc, cached_name, name_lower = entry
+                # O nome é relido a cada tick (no Linux sai da mesma leitura do /proc/<pid>/stat),
+                # de modo que um PID reutilizado por outro processo nunca fica com o nome antigo
+                info = proc.as_dict(attrs=['name', 'cpu_percent', 'memory_percent'])
+                name = info['name']
+                if name != cached_name:
+                    name_lower = name.lower() if name else None
+                    _proc_cache[pid] = (proc, name, name_lower)
+                if not name:
+                    continue  # Nome inacessível: processo é ignorado
+                snapshot.append(pid, name, info['cpu_percent'], info['memory_percent'], name_lower)
             except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                _proc_cache.pop(pid, None)
                 continue  # Ignora processos inacessíveis
 
-        # Retorna mesmo se process_found for False (retornará 0, 0, [])
-        return total_cpu, total_mem_percent, pids_found
+        return snapshot
+
+    except Exception as e:
+        raise StatsCollectionError(
+            f"Erro ao varrer a lista de processos: {e}") from e
+
+
+def build_name_matcher(process_names):
+    """
+    Monta, uma única vez, a função que indica quais alvos estão contidos em um nome
+    de processo (já em minúsculas), em uma única passada sobre o nome.
+
+    Usa um autômato Aho-Corasick (pacote opcional pyahocorasick) quando disponível.
+    Caso contrário, usa uma regex compilada com a alternância de todos os alvos como
+    pré-filtro: só os nomes que casam com ela são testados alvo a alvo.
+
+    Args:
+        process_names (list): Nomes (ou partes do nome) dos processos monitorados.
+
+    Returns:
+        callable: match(name_lower) -> coleção com os nomes originais dos alvos encontrados.
+    """
+    targets = {}
+    for name in process_names:
+        targets.setdefault(name.lower(), set()).add(name)
+    if not targets:
+        return lambda name_lower: ()
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for target, originals in targets.items():
+            automaton.add_word(target, originals)
+        automaton.make_automaton()
+
+        def match(name_lower):
+            hits = set()
+            for _, originals in automaton.iter(name_lower):
+                hits |= originals
+            return hits
+        return match
+
+    prefilter = re.compile('|'.join(re.escape(target) for target in targets))
+    target_items = list(targets.items())
+
+    def match(name_lower):
+        if not prefilter.search(name_lower):
+            return ()
+        hits = set()
+        for target, originals in target_items:
+            if target in name_lower:
+                hits |= originals
+        return hits
+    return match
+
+
+def get_all_process_stats(process_names, snapshot=None, matcher=None, acc=None):
+    """
+    Coleta estatísticas de CPU/memória e PIDs de TODOS os alvos em uma única passada
+    sobre o snapshot: cada nome de processo (já em minúsculas) passa uma única vez
+    pelo matcher de build_name_matcher(), que indica todos os alvos contidos nele.
+    Usa o snapshot de scan_all_processes() quando informado (evita uma nova varredura).
+
+    Args:
+        process_names (list): Nomes (ou partes do nome) dos processos monitorados.
+        snapshot (ProcessSnapshot|None): Resultado de scan_all_processes(); se None, faz uma nova varredura.
+        matcher (callable|None): Resultado de build_name_matcher(process_names), montado uma vez
+                                 na inicialização; se None, é montado nesta chamada.
+        acc (dict|None): Dicionário retornado pela chamada anterior (mesmos process_names);
+                         é zerado e reaproveitado, sem alocar novos dicionários/listas a cada tick.
+
+    Returns:
+        dict: {process_name: [total_cpu, total_mem_percent, [pids]]}; [0.0, 0.0, []] se não encontrado.
+
+    Raises:
+        StatsCollectionError: Se ocorrer um erro durante a coleta.
+    """
+    if snapshot is None:
+        snapshot = scan_all_processes()
+    if matcher is None:
+        matcher = build_name_matcher(process_names)
+
+    if acc is None:
+        acc = {name: [0.0, 0.0, []] for name in process_names}
+    else:
+        for totals in acc.values():
+            totals[0] = totals[1] = 0.0
+            totals[2].clear()
+    try:
+        # Passada única sobre as colunas, sem montar dicionários por processo
+        for pid, name_lower, cpu, mem in zip(snapshot.pids, snapshot.names_lower, snapshot.cpu, snapshot.mem):
+            for name in matcher(name_lower):
+                totals = acc[name]
+                totals[0] += cpu if cpu is not None else 0.0
+                totals[1] += mem if mem is not None else 0.0
+                totals[2].append(pid)
+
+        return acc
 
     except Exception as e:
         # Levanta uma exceção específica em vez de logar aqui
         raise StatsCollectionError(
-            f"Erro ao iterar ou coletar estatísticas para o processo '{process_name}': {e}") from e
+            f"Erro ao iterar ou coletar estatísticas dos processos {process_names}: {e}") from e
 
 
-def get_top_processes(num_processes=10,type='cpu'):
+def get_process_stats(process_name, snapshot=None):
+    """
+    Coleta estatísticas de CPU/memória e PIDs para processos cujo nome contém process_name.
+    Levanta StatsCollectionError em caso de falha na iteração. Retorna (0, 0, []) se não encontrado.
+    """
+    return tuple(get_all_process_stats([process_name], snapshot)[process_name])
+
+
+def get_top_processes(num_processes=10,type='cpu', snapshot=None):
     """
     Coleta informações dos N processos que mais consomem CPU, incluindo uso de memória.
 
     Args:
         num_processes (int): O número de processos a serem retornados.
         type (str): O tipo de métrica a ser usada para ordenação ('cpu' ou 'mem').
+        snapshot (ProcessSnapshot|None): Resultado de scan_all_processes(); se None, faz uma nova varredura.
 
     Returns:
         list: Uma lista de dicionários, cada um contendo 'pid', 'name', 'cpu', 'mem'.
@@ -136,44 +547,45 @@ def get_top_processes(num_processes=10,type='cpu'):
     Raises:
         StatsCollectionError: Se ocorrer um erro significativo durante a coleta.
     """
-    processes_data = []
-    try:
-        # ---> Pede também 'memory_percent' ao iterar <---
-        for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-            try:
-                cpu_percent = proc.info['cpu_percent']
-                # ---> Coleta memory_percent <---
-                mem_percent = proc.info['memory_percent']
-
-                # Inclui se tiver nome e ambos os percentuais (mesmo que 0.0)
-                if proc.info['name'] and cpu_percent is not None and mem_percent is not None:
-                    processes_data.append({
-                        'pid': proc.info['pid'],
-                        'name': proc.info['name'],
-                        'cpu': cpu_percent,                        
-                        'mem': mem_percent
-                    })
-            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-                continue
-            except Exception as inner_e:
-                print(f"Aviso: Erro ao processar PID {proc.info.get('pid', '?')}: {inner_e}", file=sys.stderr) # Debug
-                continue
+    if snapshot is None:
+        snapshot = scan_all_processes()
 
-        # Ordena APENAS pelo percentual de CPU
-        sorted_processes = sorted(
-            processes_data, key=lambda p: p[type], reverse=True)
-
-        return sorted_processes[:num_processes]
+    try:
+        cpu_col = snapshot.cpu
+        mem_col = snapshot.mem
+        key_col = cpu_col if type == 'cpu' else mem_col
+        # Índices dos processos com ambos os percentuais obtidos (mesmo que 0.0)
+        indexes = (i for i in range(len(snapshot))
+                   if cpu_col[i] is not None and mem_col[i] is not None)
+
+        # Seleciona os N maiores pela métrica escolhida (heap de N, sem ordenar tudo);
+        # dicionários só para os N retornados
+        top_indexes = heapq.nlargest(num_processes, indexes, key=key_col.__getitem__)
+        return [
+            {'pid': snapshot.pids[i], 'name': snapshot.names[i],
+             'cpu': cpu_col[i], 'mem': mem_col[i]}
+            for i in top_indexes
+        ]
 
     except Exception as e:
         raise StatsCollectionError(
             f"Erro ao iterar processos para obter Top CPU: {e}") from e
 
 
-def get_core_info():
+@functools.lru_cache(maxsize=1)
+def _cpu_counts():
+    """Retorna (núcleos físicos, núcleos lógicos); não mudam durante a execução, então é memoizado."""
+    return psutil.cpu_count(logical=False), psutil.cpu_count(logical=True)
+
+
+def get_core_info(system_usage_percent=None):
     """
     Obtém informações sobre os núcleos da CPU e o uso percentual total do sistema.
 
+    Args:
+        system_usage_percent (float|None): Uso total já medido neste tick (get_system_stats());
+            se None, é medido aqui, sem bloquear (desde a medição anterior).
+
     Returns:
         dict: Um dicionário contendo:
               'physical' (int|None): número de núcleos físicos.
@@ -189,10 +601,14 @@ def get_core_info():
         'system_usage_percent': None
     }
     try:
-        core_info['physical'] = psutil.cpu_count(logical=False)
-        core_info['logical'] = psutil.cpu_count(logical=True)
-        # Usa um intervalo curto para uma medição mais representativa do uso atual do sistema
-        core_info['system_usage_percent'] = psutil.cpu_percent(interval=0.1)
+        core_info['physical'], core_info['logical'] = _cpu_counts()
+        # Reaproveita a medição do tick; medir de novo aqui cobriria só os microssegundos
+        # desde a leitura anterior (e interval=0.1 bloquearia a coleta por 100 ms)
+        if system_usage_percent is None:
+            system_usage_percent = _read_cpu_percent()
+            if system_usage_percent is None:
+                system_usage_percent = psutil.cpu_percent(interval=None)
+        core_info['system_usage_percent'] = system_usage_percent
 
         # Verifica se algum valor essencial não foi obtido (pouco provável para cpu_count/percent)
         if core_info['physical'] is None or core_info['logical'] is None or core_info['system_usage_percent'] is None:
@@ -206,3 +622,30 @@ def get_core_info():
     except Exception as e:
         raise CoreInfoError(
             f"Erro ao obter informações dos núcleos/uso da CPU via psutil: {e}") from e
+
+
+def collect_stats(use_procfs=False, procfs_workers=1):
+    """
+    Executa todas as coletas de um tick (sistema, processos e núcleos da CPU).
+    Não propaga as exceções de coleta: elas ficam registradas no StatsSnapshot retornado.
+
+    Args:
+        use_procfs (bool), procfs_workers (int): Repassados para scan_all_processes().
+
+    Returns:
+        StatsSnapshot: Valores coletados e/ou erros de cada parte.
+    """
+    snapshot = StatsSnapshot()
+    try:
+        snapshot.system = get_system_stats()
+    except StatsCollectionError as e:
+        snapshot.system_error = e
+    try:
+        snapshot.processes = scan_all_processes(use_procfs, procfs_workers)
+    except StatsCollectionError as e:
+        snapshot.processes_error = e
+    try:
+        snapshot.core_info = get_core_info(snapshot.system[0] if snapshot.system else None)
+    except CoreInfoError as e:
+        snapshot.core_error = e
+    return snapshot